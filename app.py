@@ -1,16 +1,39 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request
 import joblib
-import pandas as pd
+import json
+import math
+import numpy as np
 import os
+import re
+import struct
+import sys
+import threading
+import time
 from datetime import datetime
+from functools import lru_cache
 # Attempt to import flask_cors; allow app to run without it
 try:
     from flask_cors import CORS
     CORS_AVAILABLE = True
 except Exception:
     CORS_AVAILABLE = False
+# orjson is optional; fall back to the stdlib json module
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except Exception:
+    ORJSON_AVAILABLE = False
+# onnxruntime is optional; used only when an exported model exists (see convert_to_onnx.py)
+try:
+    import onnxruntime
+    ONNXRUNTIME_AVAILABLE = True
+except Exception:
+    ONNXRUNTIME_AVAILABLE = False
 
 app = Flask(__name__)
+# Bound request bodies (Flask answers 413) and batch sizes
+app.config["MAX_CONTENT_LENGTH"] = 1024 * 1024
+MAX_BATCH_ROWS = 1000
 if CORS_AVAILABLE:
     CORS(app)
 
@@ -31,6 +54,283 @@ else:
     load_error = f"Model file not found at {MODEL_PATH}. Run the training notebook to create it."
 
 CURRENT_YEAR = datetime.now().year
+MIN_YEAR = 1900
+# Long-running processes re-read the clock at most once a day so that age stays right across New Year
+YEAR_REFRESH_SECONDS = 24 * 60 * 60
+_year_checked_at = time.monotonic()
+
+# Feature order used in training (see Bike_EDA.ipynb)
+FEATURE_NAMES = ["year", "km_driven", "ex_showroom_price", "age"]
+
+# Single-row inference goes through a preallocated ndarray instead of a
+# per-request DataFrame. The model was fitted on a DataFrame, so keep its
+# feature names for /health and drop them from the estimator so sklearn
+# does not warn on every ndarray predict.
+_X_BUF = np.empty((1, len(FEATURE_NAMES)), dtype=np.float64)
+_X_LOCK = threading.Lock()
+_predict = None
+if model_loaded:
+    trained_names = getattr(model, 'feature_names_in_', None)
+    if trained_names is not None:
+        if list(trained_names) != FEATURE_NAMES:
+            load_error = f"Unexpected model features {list(trained_names)}, expected {FEATURE_NAMES}"
+            model = None
+            model_loaded = False
+        else:
+            del model.feature_names_in_
+    if model_loaded:
+        from sklearn import config_context
+
+        def _predict(X):
+            # Skip sklearn's NaN/inf scan; the handlers already reject non-finite
+            # inputs. config_context is per call because sklearn config is thread-local.
+            with config_context(assume_finite=True):
+                return model.predict(X)
+
+# Serve predictions through ONNX Runtime when an exported model is available
+ONNX_MODEL_PATH = "best_bike_price_model.onnx"
+PREDICT_BACKEND = "sklearn"
+onnx_error = None
+# Rows checked against the sklearn model before the ONNX file is trusted
+ONNX_CHECK_ROWS = np.array([[2018, 15000, 85000, 8], [2012, 42000, 60000, 14], [2005, 80000, 45000, 21]],
+                           dtype=np.float64)
+if model_loaded and ONNXRUNTIME_AVAILABLE and os.path.exists(ONNX_MODEL_PATH):
+    try:
+        _onnx_session = onnxruntime.InferenceSession(ONNX_MODEL_PATH, providers=["CPUExecutionProvider"])
+        _onnx_input = _onnx_session.get_inputs()[0].name
+
+        def _onnx_predict(X):
+            # The exported graph takes float32 and returns an (n, 1) float32 column
+            return _onnx_session.run(None, {_onnx_input: X.astype(np.float32)})[0].ravel().astype(np.float64)
+
+        # A stale export (e.g. from an older .pkl) must not silently replace the model.
+        # This also warms up the session.
+        if not np.allclose(_onnx_predict(ONNX_CHECK_ROWS), _predict(ONNX_CHECK_ROWS), rtol=1e-4):
+            raise ValueError(f"{ONNX_MODEL_PATH} does not match {MODEL_PATH}; re-run convert_to_onnx.py")
+        _predict = _onnx_predict
+        PREDICT_BACKEND = "onnxruntime"
+    except Exception as e:
+        # Fall back to the sklearn model if the ONNX file can't be loaded or is stale
+        onnx_error = str(e)
+
+# Small tree models and linear models are turned into generated Python source at
+# load time, so single-row predictions skip sklearn's dispatch and ndarrays.
+MAX_GENERATED_NODES = 5000
+# sklearn trees compare float32 inputs, so the generated code rounds the same way
+_F32 = struct.Struct("4f")
+
+
+def _tree_source(tree, scale, node=0):
+    """Nested conditional expression for one fitted sklearn regression tree."""
+    left = tree.children_left[node]
+    if left == -1:
+        value = float(tree.value[node][0][0])
+        return repr(value if scale is None else scale * value)
+    return (f"({_tree_source(tree, scale, left)} if x{tree.feature[node]} <= {float(tree.threshold[node])!r} "
+            f"else {_tree_source(tree, scale, tree.children_right[node])})")
+
+
+def generate_row_predictor(model):
+    """Return f(year, km_driven, ex_showroom_price, age) computing model.predict for one row,
+    or None if the model type is not supported.
+    """
+    from sklearn.dummy import DummyRegressor
+    from sklearn.ensemble import GradientBoostingRegressor
+    from sklearn.linear_model import ElasticNet, Lasso, LinearRegression, Ridge
+    from sklearn.tree import DecisionTreeRegressor
+
+    lines = ["def _generated_predict(year, km_driven, ex_showroom_price, age):"]
+    if isinstance(model, (LinearRegression, Ridge, Lasso, ElasticNet)):
+        coef = np.ravel(model.coef_)
+        if coef.shape != (len(FEATURE_NAMES),):
+            return None
+        terms = [f"{float(c)!r} * {name}" for c, name in zip(coef, FEATURE_NAMES)]
+        lines.append(f"    return {' + '.join(terms)} + {float(np.ravel(model.intercept_)[0])!r}")
+    else:
+        # Accumulate like sklearn: start from the init prediction, add each scaled tree output
+        if isinstance(model, DecisionTreeRegressor):
+            init, trees = 0.0, [(model.tree_, None)]
+        elif isinstance(model, GradientBoostingRegressor):
+            if model.init_ == "zero":
+                init = 0.0
+            elif isinstance(model.init_, DummyRegressor):
+                init = float(np.ravel(model.init_.constant_)[0])
+            else:
+                return None
+            trees = [(est.tree_, model.learning_rate) for est in model.estimators_[:, 0]]
+        else:
+            return None
+        if any(tree.n_outputs != 1 for tree, _ in trees):
+            return None
+        if sum(tree.node_count for tree, _ in trees) > MAX_GENERATED_NODES:
+            return None
+        lines.append("    x0, x1, x2, x3 = _unpack(_pack(year, km_driven, ex_showroom_price, age))")
+        lines.append(f"    out = {init!r}")
+        lines.extend(f"    out += {_tree_source(tree, scale)}" for tree, scale in trees)
+        lines.append("    return out")
+
+    namespace = {"_pack": _F32.pack, "_unpack": _F32.unpack}
+    exec(compile("\n".join(lines), "<generated predictor>", "exec"), namespace)
+    return namespace["_generated_predict"]
+
+
+# The generated code reproduces the sklearn model, so it is only used when
+# sklearn is also the batch backend; otherwise /predict and /predict_batch
+# would disagree (ONNX runs in float32).
+_predict_row = None
+if model_loaded and PREDICT_BACKEND == "sklearn":
+    try:
+        _predict_row = generate_row_predictor(model)
+    except Exception:
+        # Unexpected model internals; single rows keep going through _predict
+        _predict_row = None
+
+# Warm up the prediction path so the first request doesn't pay for lazy
+# initialization. Under gunicorn --preload this runs once, before forking.
+# The ONNX session is already warmed by its load-time check above.
+if model_loaded:
+    try:
+        _predict(np.zeros((1, len(FEATURE_NAMES)), dtype=np.float64))
+    except Exception as e:
+        # A model that can't predict is reported like one that can't be loaded
+        load_error = str(e)
+        model = None
+        model_loaded = False
+
+
+def predict_one(year, km_driven, ex_showroom_price, age):
+    """Predict a single row, via the generated predictor when there is one."""
+    if _predict_row is not None:
+        try:
+            return _predict_row(year, km_driven, ex_showroom_price, age)
+        except OverflowError:
+            # Input beyond float32 range; let the model handle it
+            pass
+    # The buffer is shared between request threads, so fill and predict under a lock
+    with _X_LOCK:
+        _X_BUF[0, 0] = year
+        _X_BUF[0, 1] = km_driven
+        _X_BUF[0, 2] = ex_showroom_price
+        _X_BUF[0, 3] = age
+        return float(_predict(_X_BUF)[0])
+
+
+# Keyed on the exact inputs so a cache hit returns the same value the model would
+@lru_cache(maxsize=4096)
+def _predict_cached(year, km_driven, ex_showroom_price):
+    """Model prediction for a (year, km_driven, ex_showroom_price) key."""
+    return predict_one(year, km_driven, ex_showroom_price, CURRENT_YEAR - year)
+
+
+def current_year():
+    """Return CURRENT_YEAR, refreshing it from the clock at most once a day."""
+    global CURRENT_YEAR, _year_checked_at
+    now = time.monotonic()
+    if now - _year_checked_at >= YEAR_REFRESH_SECONDS:
+        _year_checked_at = now
+        year = datetime.now().year
+        if year != CURRENT_YEAR:
+            CURRENT_YEAR = year
+            # Cached predictions embed the old age
+            _predict_cached.cache_clear()
+    return CURRENT_YEAR
+
+
+def predict_price(year, km_driven, ex_showroom_price):
+    """Base model prediction, served from the LRU cache when possible."""
+    return _predict_cached(year, km_driven, ex_showroom_price)
+
+
+# Heuristic multipliers (configurable). Unknown or missing values map to 1.0.
+OWNER_MULTIPLIERS = {
+    '1st owner': 1.05,
+    '2nd owner': 0.98,
+    '3rd owner': 0.94,
+    '4th owner': 0.90
+}
+SELLER_MULTIPLIERS = {
+    'individual': 1.00,
+    'dealer': 1.03,
+    'trustmark dealer': 1.05
+}
+MODEL_MULTIPLIERS = {
+    'royal': 1.15,     # Royal Enfield-like premium
+    'honda': 1.06,
+    'yamaha': 1.05,
+    'bajaj': 1.00,
+    'hero': 1.00,
+    'suzuki': 1.04
+}
+# km-driven bands: <15000, 15000-30000, 30000-50000, >50000 (lower price when higher kms)
+KM_BAND_LIMITS = (15000, 30000, 50000)
+KM_MULTIPLIERS = (1.03, 1.0, 0.95, 0.88)
+_KM_LOW, _KM_MID, _KM_HIGH = KM_BAND_LIMITS
+
+# Owner/seller keys are interned since the UI submits them verbatim
+OWNER_MULTIPLIERS = {sys.intern(key): value for key, value in OWNER_MULTIPLIERS.items()}
+SELLER_MULTIPLIERS = {sys.intern(key): value for key, value in SELLER_MULTIPLIERS.items()}
+# Brand priority when a name mentions several brands: first listed wins
+MODEL_PRIORITY = {key: i for i, key in enumerate(MODEL_MULTIPLIERS)}
+_MODEL_BY_PRIORITY = tuple(MODEL_MULTIPLIERS.values())
+_MODEL_BRANDS = tuple(MODEL_MULTIPLIERS)
+# One compiled scan over the model name instead of a substring test per brand
+_BRAND_RE = re.compile("|".join(map(re.escape, MODEL_MULTIPLIERS)))
+
+
+def _to_builtin(obj):
+    """json.dumps fallback for numpy arrays and scalars."""
+    return obj.tolist()
+
+
+def json_response(payload, status=200):
+    """Serialize an API payload straight into a Response, bypassing jsonify."""
+    if ORJSON_AVAILABLE:
+        body = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        body = json.dumps(payload, default=_to_builtin)
+    return Response(body, status=status, mimetype="application/json")
+
+
+def load_json_payload():
+    """Parse the raw request body as JSON; returns None for an empty body."""
+    body = request.get_data()
+    if not body:
+        return None
+    return orjson.loads(body) if ORJSON_AVAILABLE else json.loads(body)
+
+
+def _category_multiplier(multipliers, value):
+    """Owner/seller multiplier, or 1.0 if the value is empty or unknown."""
+    if not value:
+        return 1.0
+    # Values from the UI are already lowercase; only lower() on a miss
+    mult = multipliers.get(value)
+    if mult is None:
+        mult = multipliers.get(value.lower(), 1.0)
+    return mult
+
+
+def _model_multiplier(model_name):
+    """Multiplier for the brand in a free-text model name; when several brands
+    appear (e.g. "Hero Honda"), the one listed first in MODEL_MULTIPLIERS wins.
+    """
+    if model_name:
+        lowered = model_name.lower()
+        match = _BRAND_RE.search(lowered)
+        if match is not None:
+            # The scan returns the leftmost brand; a higher-ranked one may still appear
+            # later or overlap it (e.g. "heroyal"), so check those in priority order.
+            best = MODEL_PRIORITY[match.group()]
+            for priority in range(best):
+                if _MODEL_BRANDS[priority] in lowered:
+                    return _MODEL_BY_PRIORITY[priority]
+            return _MODEL_BY_PRIORITY[best]
+    return 1.0
+
+
+def _km_band(km):
+    """Index into KM_MULTIPLIERS; works on a scalar or an ndarray of kms."""
+    return (km >= _KM_LOW) * 1 + (km > _KM_MID) + (km > _KM_HIGH)
 
 
 def apply_heuristics(base_pred, owner=None, seller_type=None, model_name=None, km_driven=None, apply_adjustments=False):
@@ -38,74 +338,30 @@ def apply_heuristics(base_pred, owner=None, seller_type=None, model_name=None, k
     These are configurable, lightweight adjustments (NOT a replacement for retraining).
     Returns: adjusted_prediction, breakdown(dict)
     """
-    breakdown = {"base": float(base_pred)}
-
+    base = float(base_pred)
     if not apply_adjustments:
-        return float(base_pred), breakdown
-
-    # Base multipliers
-    owner_map = {
-        '1st owner': 1.05,
-        '2nd owner': 0.98,
-        '3rd owner': 0.94,
-        '4th owner': 0.90
-    }
-    seller_map = {
-        'individual': 1.00,
-        'dealer': 1.03,
-        'trustmark dealer': 1.05
-    }
-    model_map = {
-        'royal': 1.15,     # Royal Enfield-like premium
-        'honda': 1.06,
-        'yamaha': 1.05,
-        'bajaj': 1.00,
-        'hero': 1.00,
-        'suzuki': 1.04
-    }
-
-    multiplier = 1.0
-
-    if owner:
-        owner_key = owner.lower()
-        mult = owner_map.get(owner_key, 1.0)
-        multiplier *= mult
-        breakdown['owner_multiplier'] = mult
-
-    if seller_type:
-        seller_key = seller_type.lower()
-        mult = seller_map.get(seller_key, 1.0)
-        multiplier *= mult
-        breakdown['seller_multiplier'] = mult
+        return base, {"base": base}
 
+    m_owner = _category_multiplier(OWNER_MULTIPLIERS, owner)
+    m_seller = _category_multiplier(SELLER_MULTIPLIERS, seller_type)
+    m_km = 1.0
     if km_driven is not None:
-        # km-driven adjustment: lower price when higher kms
-        if km_driven > 50000:
-            mult = 0.88
-        elif km_driven > 30000:
-            mult = 0.95
-        elif km_driven < 15000:
-            mult = 1.03
-        else:
-            mult = 1.0
-        multiplier *= mult
-        breakdown['km_multiplier'] = mult
-
-    if model_name:
-        lowered = model_name.lower()
-        found = False
-        for key, val in model_map.items():
-            if key in lowered:
-                multiplier *= val
-                breakdown['model_multiplier'] = val
-                found = True
-                break
-        if not found:
-            breakdown['model_multiplier'] = 1.0
-
-    adjusted = float(base_pred * multiplier)
-    breakdown['adjusted'] = adjusted
-    breakdown['total_multiplier'] = multiplier
+        # Same banding as _km_band, inlined for the single-row path
+        m_km = KM_MULTIPLIERS[(km_driven >= _KM_LOW) + (km_driven > _KM_MID) + (km_driven > _KM_HIGH)]
+    m_model = _model_multiplier(model_name)
+    total = m_owner * m_seller * m_km * m_model
+    adjusted = base * total
+
+    # Missing or unknown inputs report a neutral 1.0 multiplier
+    breakdown = {
+        "base": base,
+        "owner_multiplier": m_owner,
+        "seller_multiplier": m_seller,
+        "km_multiplier": m_km,
+        "model_multiplier": m_model,
+        "adjusted": adjusted,
+        "total_multiplier": total
+    }
 
     return adjusted, breakdown
 
@@ -125,34 +381,31 @@ def index():
 
     if request.method == "POST":
         try:
-            # read inputs from form
-            year = int(request.form.get("year"))
-            km_driven = float(request.form.get("km_driven"))
-            ex_showroom_price = float(request.form.get("ex_showroom_price"))
+            # read inputs from form (fetch the mapping once)
+            form = request.form
+            year = int(form["year"])
+            km_driven = float(form["km_driven"])
+            ex_showroom_price = float(form["ex_showroom_price"])
 
             # optional fields for OLX-like adjustments
-            owner = request.form.get("owner") or None
-            seller_type = request.form.get("seller_type") or None
-            model_name = request.form.get("model_name") or None
-            apply_adjustments = request.form.get("apply_adjustments") == 'on'
-
-            # Basic validation
-            if year < 1900 or year > CURRENT_YEAR:
+            owner = form.get("owner") or None
+            seller_type = form.get("seller_type") or None
+            model_name = form.get("model_name") or None
+            apply_adjustments = form.get("apply_adjustments") == 'on'
+
+            # Basic validation; the OR is negative iff year is outside [MIN_YEAR, cur_year]
+            cur_year = current_year()
+            if (year - MIN_YEAR) | (cur_year - year) < 0:
                 raise ValueError("Please enter a valid manufacturing year.")
+            if not math.isfinite(km_driven) or not math.isfinite(ex_showroom_price):
+                raise ValueError("Kilometers driven and ex-showroom price must be numbers.")
             if km_driven < 0:
                 raise ValueError("Kilometers driven cannot be negative.")
             if ex_showroom_price <= 0:
                 raise ValueError("Ex-showroom price must be positive.")
 
-            # Compute age (match training features)
-            age = CURRENT_YEAR - year
-
-            # Build input DataFrame with same feature order used in training
-            X = pd.DataFrame([[year, km_driven, ex_showroom_price, age]],
-                             columns=["year", "km_driven", "ex_showroom_price", "age"])
-
-            pred = model.predict(X)[0]
-            prediction = float(pred)
+            # Age is derived from year inside the prediction cache (match training features)
+            prediction = predict_price(year, km_driven, ex_showroom_price)
 
             # Apply heuristic adjustments if requested
             adjusted_prediction, breakdown = apply_heuristics(prediction, owner=owner,
@@ -168,78 +421,144 @@ def index():
                            breakdown=breakdown, error=error)
 
 
+# Model load state is fixed for the lifetime of the process; /health only adds
+# the current cache statistics to it.
+_HEALTH_INFO = {
+    'model_loaded': model_loaded,
+    'model_path': MODEL_PATH,
+    'load_error': load_error if not model_loaded else None,
+    'feature_names': FEATURE_NAMES if model_loaded else None,
+    'cors_available': CORS_AVAILABLE,
+    'predict_backend': PREDICT_BACKEND if model_loaded else None,
+    'onnx_error': onnx_error,
+    'row_predict_backend': ("generated_sklearn" if _predict_row is not None else PREDICT_BACKEND) if model_loaded else None
+}
+
+
 @app.route('/health', methods=['GET'])
 def health():
     """Health endpoint to verify model is loaded and show model info."""
-    # Make sure everything returned is JSON serializable
-    feature_names = getattr(model, 'feature_names_in_', None)
-    if feature_names is not None:
-        try:
-            # convert numpy arrays to lists if needed
-            feature_names = list(feature_names)
-        except Exception:
-            feature_names = str(feature_names)
-
-    return jsonify({
-        'model_loaded': model_loaded,
-        'model_path': MODEL_PATH,
-        'load_error': load_error if not model_loaded else None,
-        'feature_names': feature_names,
-        'cors_available': CORS_AVAILABLE
-    })
+    info = dict(_HEALTH_INFO, prediction_cache=_predict_cached.cache_info()._asdict())
+    return Response(json.dumps(info, sort_keys=True), mimetype="application/json")
 
 
 @app.route("/predict", methods=["POST"])
-def predict_api():
+def predict_api(_int=int, _float=float, _bool=bool, _isfinite=math.isfinite, _MIN_YEAR=MIN_YEAR,
+                _current_year=current_year,
+                _predict_price=predict_price, _apply_heuristics=apply_heuristics,
+                _json_response=json_response, _load_json_payload=load_json_payload):
     """JSON API. Expect JSON payload with keys: year, km_driven, ex_showroom_price
        Optional keys to approximate OLX-like behavior: owner, seller_type, model_name, apply_adjustments (bool)
        Example: {"year":2018, "km_driven":15000, "ex_showroom_price":85000, "owner":"1st owner", "apply_adjustments": true}
+       The underscore defaults pre-bind hot globals as locals; callers never pass them.
     """
-    data = request.get_json(force=True)
+    try:
+        data = _load_json_payload()
+    except ValueError:
+        return _json_response({"error": "Invalid JSON payload"}, 400)
     required = ["year", "km_driven", "ex_showroom_price"]
 
     if not data:
-        return jsonify({"error": "No JSON payload provided"}), 400
+        return _json_response({"error": "No JSON payload provided"}, 400)
 
     missing = [k for k in required if k not in data]
     if missing:
-        return jsonify({"error": f"Missing fields: {missing}"}), 400
+        return _json_response({"error": f"Missing fields: {missing}"}, 400)
 
     try:
-        year = int(data["year"])
-        km_driven = float(data["km_driven"])
-        ex_showroom_price = float(data["ex_showroom_price"])
-
-        if year < 1900 or year > CURRENT_YEAR:
-            return jsonify({"error": "Invalid year"}), 400
-        if km_driven < 0:
-            return jsonify({"error": "Invalid km_driven"}), 400
-        if ex_showroom_price <= 0:
-            return jsonify({"error": "Invalid ex_showroom_price"}), 400
-
-        age = CURRENT_YEAR - year
+        year = _int(data["year"])
+        km_driven = _float(data["km_driven"])
+        ex_showroom_price = _float(data["ex_showroom_price"])
 
-        X = pd.DataFrame([[year, km_driven, ex_showroom_price, age]],
-                         columns=["year", "km_driven", "ex_showroom_price", "age"])
+        # The OR is negative iff year is outside [MIN_YEAR, cur_year]
+        cur_year = _current_year()
+        if (year - _MIN_YEAR) | (cur_year - year) < 0:
+            return _json_response({"error": "Invalid year"}, 400)
+        if km_driven < 0 or not _isfinite(km_driven):
+            return _json_response({"error": "Invalid km_driven"}, 400)
+        if ex_showroom_price <= 0 or not _isfinite(ex_showroom_price):
+            return _json_response({"error": "Invalid ex_showroom_price"}, 400)
 
-        pred = float(model.predict(X)[0])
+        pred = _predict_price(year, km_driven, ex_showroom_price)
 
         # Optional heuristic adjustments
         owner = data.get("owner")
         seller_type = data.get("seller_type")
         model_name = data.get("model_name")
-        apply_adjustments = bool(data.get("apply_adjustments", False))
+        apply_adjustments = _bool(data.get("apply_adjustments", False))
 
-        adjusted, breakdown = apply_heuristics(pred, owner=owner, seller_type=seller_type,
-                                              model_name=model_name, km_driven=km_driven,
-                                              apply_adjustments=apply_adjustments)
+        adjusted, breakdown = _apply_heuristics(pred, owner=owner, seller_type=seller_type,
+                                               model_name=model_name, km_driven=km_driven,
+                                               apply_adjustments=apply_adjustments)
 
         resp = {"predicted_selling_price": pred, "adjusted_prediction": adjusted, "breakdown": breakdown}
-        return jsonify(resp)
+        return _json_response(resp)
+    except Exception as e:
+        return _json_response({"error": str(e)}, 500)
+
+
+@app.route("/predict_batch", methods=["POST"])
+def predict_batch_api():
+    """Batch JSON API. Expect {"rows": [...]} where each row has the same keys as /predict.
+       All rows are predicted with a single model call and adjusted with vectorized multiplies.
+       Returns {"predicted_selling_prices": [...], "adjusted_predictions": [...]} in row order,
+       or a 400 listing the indices of rows that fail validation.
+    """
+    try:
+        data = load_json_payload()
+    except ValueError:
+        return json_response({"error": "Invalid JSON payload"}, 400)
+    required = ["year", "km_driven", "ex_showroom_price"]
+
+    rows = data.get("rows") if isinstance(data, dict) else None
+    if not rows or not isinstance(rows, list):
+        return json_response({"error": "Expected a non-empty 'rows' list"}, 400)
+    if len(rows) > MAX_BATCH_ROWS:
+        return json_response({"error": f"At most {MAX_BATCH_ROWS} rows per request"}, 400)
+
+    missing = [i for i, row in enumerate(rows) if not isinstance(row, dict) or any(k not in row for k in required)]
+    if missing:
+        return json_response({"error": f"Rows must be objects with the required fields: {missing}"}, 400)
+
+    try:
+        n = len(rows)
+        cur_year = current_year()
+        # Clamp just outside the valid range so huge ints fit int64 and still fail the mask
+        years = np.fromiter((min(max(int(row["year"]), MIN_YEAR - 1), cur_year + 1) for row in rows),
+                            dtype=np.int64, count=n)
+        kms = np.fromiter((float(row["km_driven"]) for row in rows), dtype=np.float64, count=n)
+        prices = np.fromiter((float(row["ex_showroom_price"]) for row in rows), dtype=np.float64, count=n)
+
+        # One mask covers every rule; report all offending rows at once
+        valid = (years >= MIN_YEAR) & (years <= cur_year) & (kms >= 0) & (prices > 0)
+        # sklearn's own NaN/inf scan is skipped (assume_finite), so reject them here
+        valid &= np.isfinite(kms) & np.isfinite(prices)
+        if not valid.all():
+            return json_response({"error": "Invalid rows", "invalid_rows": np.flatnonzero(~valid).tolist()}, 400)
+
+        X = np.empty((n, len(FEATURE_NAMES)), dtype=np.float64)
+        X[:, 0] = years
+        X[:, 1] = kms
+        X[:, 2] = prices
+        X[:, 3] = cur_year - years
+        preds = _predict(X)
+
+        owner_mults = np.fromiter((_category_multiplier(OWNER_MULTIPLIERS, row.get("owner")) for row in rows),
+                                  dtype=np.float64, count=n)
+        seller_mults = np.fromiter((_category_multiplier(SELLER_MULTIPLIERS, row.get("seller_type")) for row in rows),
+                                   dtype=np.float64, count=n)
+        model_mults = np.fromiter((_model_multiplier(row.get("model_name")) for row in rows), dtype=np.float64, count=n)
+        km_mults = np.take(KM_MULTIPLIERS, _km_band(kms))
+        apply_adjustments = np.fromiter((bool(row.get("apply_adjustments", False)) for row in rows), dtype=bool, count=n)
+
+        multipliers = owner_mults * seller_mults * km_mults * model_mults
+        adjusted = np.where(apply_adjustments, preds * multipliers, preds)
+
+        return json_response({"predicted_selling_prices": preds, "adjusted_predictions": adjusted})
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return json_response({"error": str(e)}, 500)
 
 
 if __name__ == "__main__":
-    # For local development only. Use a WSGI server for production.
+    # For local development only. Use a WSGI server for production (see wsgi.py).
     app.run(host="0.0.0.0", port=5000, debug=True)
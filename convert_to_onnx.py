@@ -0,0 +1,42 @@
+"""Convert the trained sklearn model to ONNX for faster inference.
+
+Offline step (needs skl2onnx, not required by the web app):
+
+    pip install skl2onnx onnxruntime
+    python convert_to_onnx.py
+
+app.py serves predictions through onnxruntime when the .onnx file exists and
+onnxruntime is installed; otherwise it keeps using the pickled model.
+"""
+import joblib
+import numpy as np
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType
+
+MODEL_PATH = "best_bike_price_model.pkl"
+ONNX_MODEL_PATH = "best_bike_price_model.onnx"
+N_FEATURES = 4  # year, km_driven, ex_showroom_price, age
+
+
+def main():
+    model = joblib.load(MODEL_PATH)
+    onx = convert_sklearn(model, initial_types=[("input", FloatTensorType([None, N_FEATURES]))],
+                          target_opset={"": 17, "ai.onnx.ml": 3})
+    with open(ONNX_MODEL_PATH, "wb") as f:
+        f.write(onx.SerializeToString())
+
+    # Sanity check: ONNX runs in float32, so allow a small relative difference
+    try:
+        import onnxruntime
+    except ImportError:
+        print(f"Wrote {ONNX_MODEL_PATH} (install onnxruntime to verify it)")
+        return
+    X = np.array([[2018, 15000, 85000, 8], [2012, 42000, 60000, 14]], dtype=np.float64)
+    sess = onnxruntime.InferenceSession(ONNX_MODEL_PATH, providers=["CPUExecutionProvider"])
+    onnx_pred = sess.run(None, {"input": X.astype(np.float32)})[0].ravel()
+    sk_pred = model.predict(X)
+    print(f"Wrote {ONNX_MODEL_PATH}; sklearn={sk_pred.tolist()} onnx={onnx_pred.tolist()}")
+
+
+if __name__ == "__main__":
+    main()
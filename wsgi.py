@@ -0,0 +1,10 @@
+"""WSGI entry point for production servers.
+
+Run with gunicorn, preloading the app so the model is loaded once in the
+master process and shared by the forked workers:
+
+    gunicorn -w 4 -k gthread --threads 8 --preload -b 0.0.0.0:5000 wsgi:app
+"""
+from app import app
+
+__all__ = ["app"]